@@ -2,11 +2,39 @@
 Base Reader (ABC)
 Created 2020.10.12 by Oliver Schwaneberg
 """
+import os
+import re
 import typing as tp
 from abc import ABC, abstractmethod
-from logging import warning
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from logging import getLogger
+from threading import Lock
+from time import monotonic
 from pymeterreader.device_lib.common import Sample, Device
 
+logger = getLogger(__name__)
+
+try:
+    from termios import error as _TermiosError
+except ImportError:  # not available on Windows
+    _PORT_ERRORS = (OSError,)
+else:
+    # pyserial lets termios.error escape from tcflush/tcsetattr on a hung-up port
+    _PORT_ERRORS = (OSError, _TermiosError)
+
+DEV_DIR = os.path.join(os.path.sep, 'dev')
+
+
+@lru_cache(maxsize=1)
+def _list_dev(time_slot: int) -> tp.List[str]:
+    """
+    List the device nodes, cached for the duration of one time slot
+    :param time_slot: index of the current caching period, a new slot forces a new listing
+    """
+    del time_slot
+    return os.listdir(DEV_DIR)
+
 
 class BaseReader(ABC):
     """
@@ -17,6 +45,10 @@ class BaseReader(ABC):
     """
     PROTOCOL = "ABSTRACT"
     BOUND_INTERFACES = set()
+    MAX_DETECT_WORKERS = 8
+    TTY_CACHE_TTL = 10
+    PORT_ERRORS = _PORT_ERRORS
+    __TTY_LOCKS = {}
 
     @abstractmethod
     def __init__(self, meter_id: tp.Union[str, int], tty=r'/dev/ttyUSB\d+', **kwargs):
@@ -28,10 +60,11 @@ class BaseReader(ABC):
         """
         self.meter_id = meter_id
         self.tty_pattern = tty
+        self._tty_regex = re.compile(tty)
         self._tty_path = None
+        self._serial = None
         if kwargs:
-            warning(f'Unknown parameter{"s" if len(kwargs) > 1 else ""}:'
-                    f' {", ".join(kwargs.keys())}')
+            logger.warning("Unknown parameter%s: %s", "s" if len(kwargs) > 1 else "", ", ".join(kwargs.keys()))
 
     @staticmethod
     def detect(devices: tp.List[Device], tty=r'/dev/ttyUSB\d+'):
@@ -41,6 +74,40 @@ class BaseReader(ABC):
         :param tty: Regex to filter tty device nodes
         """
 
+    @staticmethod
+    def _list_ttys(pattern: tp.Union[str, tp.Pattern], exclude: tp.Collection[str] = (),
+                   refresh: bool = False) -> tp.List[str]:
+        """
+        List tty nodes matching a pattern
+        :param pattern: regex or compiled pattern matched against the node names in /dev
+        :param exclude: paths to leave out, e.g. interfaces already in use
+        :param refresh: discard the cached listing of /dev, for explicitly requested scans
+        :return: paths of the matching tty nodes
+        """
+        if refresh:
+            _list_dev.cache_clear()
+        pattern = re.compile(pattern)
+        file_names = _list_dev(int(monotonic() // BaseReader.TTY_CACHE_TTL))
+        return [tty_path
+                for tty_path in (os.path.join(DEV_DIR, file_name)
+                                 for file_name in file_names
+                                 if pattern.match(file_name))
+                if tty_path not in exclude]
+
+    @staticmethod
+    def _detect_concurrently(detector: tp.Callable[[str], tp.Optional[Device]],
+                             tty_paths: tp.List[str]) -> tp.List[Device]:
+        """
+        Probe all interfaces in parallel, as each probe mostly waits for serial timeouts
+        :param detector: function probing a single tty node
+        :param tty_paths: tty nodes to probe
+        :return: detected devices in the order of tty_paths
+        """
+        if not tty_paths:
+            return []
+        with ThreadPoolExecutor(max_workers=min(BaseReader.MAX_DETECT_WORKERS, len(tty_paths))) as executor:
+            return [device for device in executor.map(detector, tty_paths) if device is not None]
+
     def __del__(self):
         """
         Set bound interface free
@@ -53,6 +120,8 @@ class BaseReader(ABC):
 
     @tty_path.setter
     def tty_path(self, tty_path):
+        if tty_path != self._tty_path:
+            self.close()
         if self._tty_path is not None:
             # Set current interface free
             self.BOUND_INTERFACES.remove(self._tty_path)
@@ -63,6 +132,67 @@ class BaseReader(ABC):
             self.BOUND_INTERFACES.add(tty_path)
         self._tty_path = tty_path
 
+    def close(self):
+        """
+        Close the interface kept open between polls, the next poll reopens it
+        """
+        if self._serial is not None:
+            try:
+                self._serial.close()
+            except self.PORT_ERRORS as err:
+                logger.debug("Error while closing port: %s", err)
+            finally:
+                self._serial = None
+
+    @staticmethod
+    def _tty_lock(tty_path: str) -> Lock:
+        """
+        Get the lock guarding an interface.
+        Each interface has its own lock, so meters on different interfaces are read concurrently.
+        :param tty_path: path of the tty node
+        :return: lock shared by all readers of this interface
+        """
+        lock = BaseReader.__TTY_LOCKS.get(tty_path)
+        if lock is None:
+            # setdefault is atomic, concurrent callers end up with the same lock
+            lock = BaseReader.__TTY_LOCKS.setdefault(tty_path, Lock())
+        return lock
+
+    @staticmethod
+    def _enable_low_latency(ser) -> None:
+        """
+        Ask the driver to pass on received bytes immediately instead of on its buffering tick.
+        Ports whose driver does not support this are left unchanged.
+        :param ser: open serial port
+        """
+        set_low_latency_mode = getattr(ser, 'set_low_latency_mode', None)
+        if set_low_latency_mode is None:
+            return
+        try:
+            set_low_latency_mode(True)
+        except (NotImplementedError, ValueError, OSError) as err:
+            logger.debug("Low latency mode not available: %s", err)
+
+    def _probe(self) -> tp.Optional[Sample]:
+        """
+        Bind to the first free interface matching the tty pattern at which poll() succeeds
+        :return: first Sample read from the bound interface, None if no interface matched
+        """
+        potential_ttys = self._list_ttys(self._tty_regex, self.BOUND_INTERFACES)
+        if not potential_ttys:
+            logger.error("Could not find any interfaces matching r'%s'!", self.tty_pattern)
+            return None
+        for tty_path in potential_ttys:
+            self.tty_path = tty_path
+            sample = self.poll()
+            if sample is not None:
+                logger.info("%s binding to %s.", self.meter_id, tty_path)
+                return sample
+            self.tty_path = None
+            logger.debug("%s not found at %s.", self.meter_id, tty_path)
+        logger.error("Could not detect meter %s while scanning %s.", self.meter_id, ', '.join(potential_ttys))
+        return None
+
     @abstractmethod
     def poll(self) -> tp.Optional[Sample]:
         """
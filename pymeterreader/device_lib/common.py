@@ -5,12 +5,16 @@ from time import time
 import typing as tp
 from string import digits, ascii_letters, punctuation
 legal_characters = digits + ascii_letters + punctuation
+# All legal characters are ASCII, hence only ASCII bytes need to be deleted
+# once non-ASCII characters have been dropped by the encoder.
+_ILLEGAL_BYTES = bytes(code for code in range(128) if chr(code) not in legal_characters)
 
 
 class Sample:
     """
     Data storage object to represent a readout
     """
+    __slots__ = ('time', 'meter_id', 'channels')
 
     def __init__(self):
         self.time = time()
@@ -22,6 +26,8 @@ class Device:
     """
     Representation of a device
     """
+    __slots__ = ('identifier', 'tty', 'protocol', 'channels')
+
     def __init__(self, identifier: str = "", tty: str = "", protocol: str = "",
                  channels: tp.Optional[tp.Dict[str, tp.Tuple[str, str]]] = None):
         self.identifier = identifier
@@ -37,4 +43,4 @@ def strip(string: str) -> str:
     :param string: original string
     :return: stripped string
     """
-    return ''.join([char for char in string if char in legal_characters]).strip().upper()
+    return string.encode('ascii', 'ignore').translate(None, _ILLEGAL_BYTES).decode('ascii').upper()
@@ -2,15 +2,15 @@
 Plain Reader
 Created 2020.10.12 by Oliver Schwaneberg
 """
-import os
 import re
-from logging import info, debug, error
+from logging import getLogger, DEBUG
 import typing as tp
 import serial
-from threading import Lock
 from pymeterreader.device_lib.base import BaseReader
 from pymeterreader.device_lib.common import Sample, Device, strip
 
+logger = getLogger(__name__)
+
 
 class PlainReader(BaseReader):
     """
@@ -21,7 +21,13 @@ class PlainReader(BaseReader):
     """
     PROTOCOL = "PLAIN"
     __START_SEQ = b"/?!\x0D\x0A"
-    __SERIAL_LOCK = Lock()
+    # wakeup zeros followed by the request message, sent with a single write
+    __DEFAULT_REQUEST = b"\x00" * 40 + __START_SEQ
+    __ID_END_SEQ = b"\x0D\x0A"
+    __END_SEQ = b"!\x0D\x0A"
+    __MAX_RESPONSE_SIZE = 4096
+    # IEC 62056-21 data sets are plain ASCII: identifier(value*unit)
+    __OBIS_PATTERN = re.compile(rb"([0-9.]+)\(([0-9.]+)\*?([\w.]*)\)")
 
     def __init__(self, meter_id: str, tty=r'ttyUSB\d+', **kwargs: int):
         """
@@ -32,11 +38,15 @@ class PlainReader(BaseReader):
         :param send_wakeup_zeros: number of zeros to send ahead of the request string
         :param initial_baudrate: Baudrate used to send the request
         :param baudrate: Baudrate used to read the answer
+        :param low_latency: request low latency mode from the serial driver (Default: True)
         """
         super().__init__(meter_id, tty)
+        self._meter_id_norm = strip(str(meter_id))
         self.wakeup_zeros = kwargs.get('send_wakeup_zeros', 40)
+        self.__request = b"\x00" * self.wakeup_zeros + self.__START_SEQ
         self.initial_baudrate = kwargs.get('initial_baudrate', 300)
         self.baudrate = kwargs.get('baudrate', 2400)
+        self.low_latency = kwargs.get('low_latency', True)
 
     def poll(self) -> tp.Optional[Sample]:
         """
@@ -44,108 +54,141 @@ class PlainReader(BaseReader):
         :return: Sample, if successful
         """
         if self.tty_path is None:
-            sample = self.__probe()
+            sample = self._probe()
             if sample:
                 return sample
-            error("This reader could not be bound to any device node!")
+            logger.error("This reader could not be bound to any device node!")
+            return None
+        try:
+            with self._tty_lock(self.tty_path):
+                if self._serial is None:
+                    self._serial = self.__open(self.tty_path, self.initial_baudrate)
+                    if self.low_latency:
+                        self._enable_low_latency(self._serial)
+                response = self.__get_response(self._serial,
+                                               request=self.__request,
+                                               initial_baudrate=self.initial_baudrate,
+                                               baudrate=self.baudrate)
+        except self.PORT_ERRORS as err:
+            logger.error("Exception occurred while accessing %s: %s", self.tty_path, err)
+            self.close()
             return None
-        response = self.__get_response(self.tty_path,
-                                       initial_baudrate=self.initial_baudrate,
-                                       baudrate=self.baudrate,
-                                       wakeup_zeros=self.wakeup_zeros)
         if response:
-            sample = self.__parse(response)
-            return sample if sample.meter_id is not None else None
+            return self.__parse(response)
         return None
 
     @staticmethod
-    def __get_response(tty, initial_baudrate: int = 300, baudrate: int = 2400, bytesize: int = 7,
-                       parity: str = 'E', stopbits: int = 1, wakeup_zeros: int = 40) -> tp.Optional[str]:
-        # pylint: disable=too-many-arguments
-        try:
-            with PlainReader.__SERIAL_LOCK:
-                ser = serial.Serial(tty,
-                                    baudrate=initial_baudrate, bytesize=bytesize,
-                                    parity=parity, stopbits=stopbits,
-                                    timeout=2)
+    def __open(tty, baudrate: int = 300, bytesize: int = 7, parity: str = 'E', stopbits: int = 1) -> serial.Serial:
+        return serial.Serial(tty,
+                             baudrate=baudrate, bytesize=bytesize,
+                             parity=parity, stopbits=stopbits,
+                             timeout=2)
 
-                # send wakeup string
-                if wakeup_zeros:
-                    ser.write(b"\x00" * wakeup_zeros)
+    @staticmethod
+    def __get_response(ser: serial.Serial, request: bytes = __DEFAULT_REQUEST,
+                       initial_baudrate: int = 300, baudrate: int = 2400) -> bytes:
+        """
+        Request and read a data message on an open port
+        :param ser: serial port, switched back to the initial baudrate for the request
+        :param request: wakeup zeros and request message
+        :return: raw data message
+        """
+        if ser.baudrate != initial_baudrate:
+            ser.baudrate = initial_baudrate
+        ser.reset_input_buffer()
 
-                # send request message
-                ser.write(PlainReader.__START_SEQ)
-                ser.flush()
+        # send wakeup string and request message
+        ser.write(request)
+        ser.flush()
 
-                # read identification message
-                init_msg = ser.readline()
+        # read identification message, keeping anything received past its end for the data message
+        buf = bytearray()
+        end = PlainReader.__read_until(ser, PlainReader.__ID_END_SEQ, buf)
+        init_msg = bytes(buf[:end])
+        del buf[:end]
 
-                # change baudrate
-                ser.baudrate = baudrate
-                response = ser.readline().decode('utf-8')
-                ser.close()
-            debug(f'Plain response: ({init_msg.decode("utf-8")})"{response}"')
-            return response
-        except OSError as err:
-            error(f'Exception occurred while accessing accessing {tty}: {err}')
-        return None
+        # change baudrate
+        ser.baudrate = baudrate
+        PlainReader.__read_until(ser, PlainReader.__END_SEQ, buf)
+        response = bytes(buf)
+        if logger.isEnabledFor(DEBUG):
+            logger.debug('Plain response: (%s)"%s"', init_msg.decode("utf-8", "replace"),
+                         response.decode("utf-8", "replace"))
+        return response
 
-    def __probe(self) -> tp.Optional[Sample]:
-        sp = os.path.sep
-        potential_ttys = [f'{sp}dev{sp}{file_name}'
-                          for file_name in os.listdir(f'{sp}dev{sp}')
-                          if re.match(self.tty_pattern, file_name)
-                          and f'{sp}dev{sp}{file_name}' not in self.BOUND_INTERFACES]
-        if not potential_ttys:
-            error(f"Could not find any interfaces matching r'{self.tty_pattern}'!")
-            return None
-        for tty_path in potential_ttys:
-            self.tty_path = tty_path
-            sample = self.poll()
-            if sample is not None:
-                info(f'{self.meter_id} binding to {tty_path}.')
-                return sample
-            self.tty_path = None
-            debug(f'{self.meter_id} not found at {tty_path}.')
-        error(f"Could not detect meter {self.meter_id} "
-              f"while scanning {', '.join(potential_ttys)}.")
-        return None
+    @staticmethod
+    def __read_until(ser: serial.Serial, end_seq: bytes, buf: bytearray) -> int:
+        """
+        Extend buf until it contains end_seq, the size limit is reached or the port times out.
+        Everything already buffered by the driver is fetched with a single read.
+        :param ser: open serial port
+        :param end_seq: terminating byte sequence
+        :param buf: receive buffer, may already hold data
+        :return: index just past end_seq in buf, or len(buf) if it was not received
+        """
+        searched = 0
+        while True:
+            found = buf.find(end_seq, searched)
+            if found >= 0:
+                return found + len(end_seq)
+            searched = max(0, len(buf) - len(end_seq) + 1)
+            if len(buf) >= PlainReader.__MAX_RESPONSE_SIZE:
+                return len(buf)
+            chunk = ser.read(min(max(ser.in_waiting, 1), PlainReader.__MAX_RESPONSE_SIZE - len(buf)))
+            if not chunk:
+                return len(buf)
+            buf += chunk
 
     @staticmethod
     def detect(devices: tp.List[Device], tty=r'ttyUSB\d+'):
-        sp = os.path.sep
-        used_interfaces = [device.tty for device in devices]
-        potential_ttys = [f'{sp}dev{sp}{file_name}'
-                          for file_name in os.listdir(f'{sp}dev{sp}')
-                          if re.match(tty, file_name)
-                          and f'{sp}dev{sp}{file_name}' not in used_interfaces]
-        for tty_path in potential_ttys:
-            response = PlainReader.__get_response(tty_path)
-            entries = {}
-            for ident, value, unit in re.findall(r"([\d.]+)\(([\d.]+)\*?([\w\d.]+)?\)", response):
-                if not unit:
-                    entries["identifier"] = value
-                else:
-                    entries[ident] = (value, unit)
-            if 'identifier' in entries:
-                device = Device(entries.pop("identifier"),
-                                tty_path,
-                                'plain',
-                                entries)
-                devices.append(device)
+        used_interfaces = {device.tty for device in devices}
+        potential_ttys = PlainReader._list_ttys(tty, used_interfaces, refresh=True)
+        devices.extend(PlainReader._detect_concurrently(PlainReader.__detect_at, potential_ttys))
 
-    def __parse(self, response) -> Sample:
+    @staticmethod
+    def __detect_at(tty_path: str) -> tp.Optional[Device]:
         """
-        Internal helper to extract relevant information
-        :param sml_frame: sml data from parser
+        Request a data message at one interface
+        :param tty_path: path of the tty node
+        :return: Device, if a plain meter answered
         """
-        parsed = Sample()
-        for ident, value, unit in re.findall(r"([\d.]+)\(([\d.]+)\*?([\w\d.]+)?\)", response):
+        try:
+            with PlainReader._tty_lock(tty_path), PlainReader.__open(tty_path) as ser:
+                response = PlainReader.__get_response(ser)
+        except PlainReader.PORT_ERRORS as err:
+            # Busy or disconnected nodes are expected while scanning
+            logger.debug("Skipping %s: %s", tty_path, err)
+            return None
+        entries = {}
+        for ident, value, unit in PlainReader.__OBIS_PATTERN.findall(response):
             if not unit:
-                if strip(self.meter_id) in value:
-                    parsed.meter_id = value
+                entries["identifier"] = value.decode('ascii')
             else:
-                parsed.channels.append({'objName': ident,
-                                        'value': float(value),
-                                        'unit': unit})
+                entries[ident.decode('ascii')] = (value.decode('ascii'), unit.decode('ascii'))
+        if 'identifier' in entries:
+            return Device(entries.pop("identifier"),
+                          tty_path,
+                          'plain',
+                          entries)
+        return None
+
+    def __parse(self, response) -> tp.Optional[Sample]:
+        """
+        Internal helper to extract relevant information
+        :param response: raw plain data message, only matched fields get decoded
+        :return: Sample, if the meter id matches
+        """
+        entries = self.__OBIS_PATTERN.findall(response)
+        meter_id_norm = self._meter_id_norm.encode('ascii')
+        # Validate the meter id first to skip building channels of other meters
+        meter_id = next((value for _, value, unit in entries
+                         if not unit and meter_id_norm in value), None)
+        if meter_id is None:
+            return None
+        parsed = Sample()
+        parsed.meter_id = meter_id.decode('ascii')
+        parsed.channels = [{'objName': ident.decode('ascii'),
+                            'value': float(value),
+                            'unit': unit.decode('ascii')}
+                           for ident, value, unit in entries if unit]
         return parsed
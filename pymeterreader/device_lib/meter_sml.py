@@ -3,16 +3,15 @@ SML Reader
 Created 2020.10.12 by Oliver Schwaneberg
 """
 from time import time
-import os
-import re
-from threading import Lock
-from logging import info, debug, error
+from logging import getLogger
 import typing as tp
 import serial
 from sml import SmlBase
 from pymeterreader.device_lib.base import BaseReader
 from pymeterreader.device_lib.common import Sample, strip, Device
 
+logger = getLogger(__name__)
+
 
 class SmlReader(BaseReader):
     """
@@ -22,9 +21,11 @@ class SmlReader(BaseReader):
     See https://en.wikipedia.org/wiki/IEC_62056
     """
     PROTOCOL = "SML"
-    __SERIAL_LOCK = Lock()
     __START_SEQ = b'\x1b\x1b\x1b\x1b\x01\x01\x01\x01'
     __END_SEQ = b'\x1b\x1b\x1b\x1b'
+    __PARITY_MAP = {'NONE': serial.PARITY_NONE, 'N': serial.PARITY_NONE,
+                    'EVEN': serial.PARITY_EVEN, 'E': serial.PARITY_EVEN,
+                    'ODD': serial.PARITY_ODD, 'O': serial.PARITY_ODD}
 
     def __init__(self, meter_id: str, tty=r'ttyUSB\d+', **kwargs):
         """
@@ -36,22 +37,22 @@ class SmlReader(BaseReader):
         :bytesize: word size on serial port (Default: 8)
         :parity: serial parity, EVEN, ODD or NONE (Default: NONE)
         :stopbits: Number of stopbits (Default: 1)
+        :low_latency: request low latency mode from the serial driver (Default: True)
         """
         try:
             self.baudrate = int(kwargs.pop('baudrate', 9600))
             self.bytesize = int(kwargs.pop('bytesize', 8))
             self.stopbits = int(kwargs.pop('stopbits', 1))
-            self.parity = serial.PARITY_NONE
-            if 'parity' in kwargs:
-                parity = strip(kwargs.pop('parity'))
-                if 'EVEN' in parity:
-                    self.parity = serial.PARITY_EVEN
-                elif 'ODD' in parity:
-                    self.parity = serial.PARITY_ODD
+            self.low_latency = bool(kwargs.pop('low_latency', True))
+            parity = strip(str(kwargs.pop('parity', 'NONE')))
+            self.parity = self.__PARITY_MAP.get(parity, serial.PARITY_NONE)
+            if parity not in self.__PARITY_MAP:
+                logger.warning("Unknown parity %s, falling back to NONE.", parity)
         except ValueError:
-            error(f'Illegal parameter set: {kwargs}')
+            logger.error("Illegal parameter set: %s", kwargs)
             return
         super().__init__(meter_id, tty, **kwargs)
+        self._meter_id_norm = strip(str(meter_id))
 
     def poll(self) -> tp.Optional[Sample]:
         """
@@ -59,13 +60,23 @@ class SmlReader(BaseReader):
         :return: Sample, if successful
         """
         if self.tty_path is None:
-            sample = self.__probe()
+            sample = self._probe()
             if sample:
                 return sample
-            error("This reader could not be bound to any device node!")
+            logger.error("This reader could not be bound to any device node!")
+            return None
+        try:
+            with self._tty_lock(self.tty_path):
+                if self._serial is None:
+                    self._serial = self.__open(self.tty_path, self.baudrate, self.bytesize,
+                                               self.parity, self.stopbits)
+                    if self.low_latency:
+                        self._enable_low_latency(self._serial)
+                frame = self.__read_frame(self._serial)
+        except self.PORT_ERRORS as err:
+            logger.error("Exception occurred while accessing %s: %s", self.tty_path, err)
+            self.close()
             return None
-        frame = self.__read_frame(self.tty_path, self.baudrate, self.bytesize,
-                                  self.parity, self.stopbits)
         if frame is not None and len(frame) > 1:
             sample = self.__parse(frame[1])
             if sample.meter_id is not None:
@@ -73,54 +84,52 @@ class SmlReader(BaseReader):
         return None
 
     @staticmethod
-    def __read_frame(tty, baudrate: int = 9600, bytesize: int = 8, parity: str = 'N', stopbits: int = 1):
-        try:
-            with SmlReader.__SERIAL_LOCK:
-                ser = serial.Serial(tty,
-                                    baudrate=baudrate,
-                                    bytesize=bytesize,
-                                    parity=parity,
-                                    stopbits=stopbits,
-                                    timeout=2)
-                timeout = time() + 10.0
-                buf = bytes()
-                while buf != SmlReader.__START_SEQ and time() < timeout:
-                    sign = ser.read()
-                    if sign in {b'\x1b', b'\x01'}:
-                        buf += sign
-                    else:
-                        buf = b''
-
-                while not buf[8:-4].endswith(SmlReader.__END_SEQ) and time() < timeout:
-                    sign = ser.read()
-                    buf += sign
-                ser.close()
+    def __open(tty, baudrate: int = 9600, bytesize: int = 8, parity: str = 'N', stopbits: int = 1) -> serial.Serial:
+        return serial.Serial(tty,
+                             baudrate=baudrate,
+                             bytesize=bytesize,
+                             parity=parity,
+                             stopbits=stopbits,
+                             timeout=2)
 
-            if buf[8:-4].endswith(SmlReader.__END_SEQ):
-                return SmlBase.parse_frame(buf)
-        except OSError as err:
-            error(f'Exception occurred while accessing accessing {tty}: {err}')
-        return None
+    @staticmethod
+    def __read_frame(ser: serial.Serial):
+        """
+        Wait for the next complete frame on an open port and parse it
+        :param ser: serial port
+        :return: parsed frame, None on timeout
+        """
+        # Drop data buffered since the last poll to return a current reading
+        ser.reset_input_buffer()
+        timeout = time() + 10.0
+        frame = None
+        buf = bytearray()
+        searched = 0
+        start_len = len(SmlReader.__START_SEQ)
+        end_len = len(SmlReader.__END_SEQ)
+        while frame is None and time() < timeout:
+            # Fetch everything buffered by the driver at once and search it with bytearray.find
+            buf += ser.read(max(ser.in_waiting, 1))
+            if searched == 0:
+                start = buf.find(SmlReader.__START_SEQ)
+                if start < 0:
+                    # Only a partial start sequence at the end can still become a frame
+                    del buf[:-(start_len - 1)]
+                    continue
+                del buf[:start]
+                searched = start_len
+            end = buf.find(SmlReader.__END_SEQ, searched)
+            if end < 0:
+                searched = max(searched, len(buf) - end_len + 1)
+            elif len(buf) >= end + end_len + 4:
+                # Slice through a memoryview to copy the frame out of the buffer only once
+                frame = bytes(memoryview(buf)[:end + end_len + 4])
+            else:
+                # Wait for the four trailer bytes
+                searched = end
 
-    def __probe(self) -> tp.Optional[Sample]:
-        sp = os.path.sep
-        potential_ttys = [f'{sp}dev{sp}{file_name}'
-                          for file_name in os.listdir(f'{sp}dev{sp}')
-                          if re.match(self.tty_pattern, file_name)
-                          and f'{sp}dev{sp}{file_name}' not in self.BOUND_INTERFACES]
-        if not potential_ttys:
-            error(f"Could not find any interfaces matching r'{self.tty_pattern}'!")
-            return None
-        for tty_path in potential_ttys:
-            self.tty_path = tty_path
-            sample = self.poll()
-            if sample is not None:
-                info(f'{self.meter_id} binding to {tty_path}.')
-                return sample
-            self.tty_path = None
-            debug(f'{self.meter_id} not found at {tty_path}.')
-        error(f"Could not detect meter {self.meter_id} "
-              f"while scanning {', '.join(potential_ttys)}.")
+        if frame is not None:
+            return SmlBase.parse_frame(frame)
         return None
 
     @staticmethod
@@ -130,55 +139,68 @@ class SmlReader(BaseReader):
         :param devices: List of previously detected devices, that will be extendedces
         :param tty: Regex to find candidate interfaces
         """
-        def walk_frame(sml_frame, entries):
-            if isinstance(sml_frame, list):
-                for elem in sml_frame:
-                    walk_frame(elem, entries)
-            elif isinstance(sml_frame, dict):
-                if 'messageBody' in sml_frame:
-                    var_list = sml_frame['messageBody'].get('valList', [])
-                    for variable in var_list:
-                        if 'unit' not in variable and 12 < len(variable.get('value')) < 32:
-                            entries["identifier"] = variable.get('value')
-                        elif 'unit' in variable:
-                            entries[variable['objName']] = (variable['value'], variable['unit'])
+        used_interfaces = {device.tty for device in devices}
+        potential_ttys = SmlReader._list_ttys(tty, used_interfaces, refresh=True)
+        devices.extend(SmlReader._detect_concurrently(SmlReader.__detect_at, potential_ttys))
+
+    @staticmethod
+    def __detect_at(tty_path: str) -> tp.Optional[Device]:
+        """
+        Wait for a frame at one interface
+        :param tty_path: path of the tty node
+        :return: Device, if an SML meter was found
+        """
+        try:
+            with SmlReader._tty_lock(tty_path), SmlReader.__open(tty_path) as ser:
+                frame = SmlReader.__read_frame(ser)
+        except SmlReader.PORT_ERRORS as err:
+            # Busy or disconnected nodes are expected while scanning
+            logger.debug("Skipping %s: %s", tty_path, err)
+            return None
+        if frame is not None and len(frame) > 1:
+            entries = {}
+            for var_list in SmlReader.__iter_val_lists(frame):
+                for variable in var_list:
+                    if 'unit' not in variable and 12 < len(variable.get('value')) < 32:
+                        entries["identifier"] = variable.get('value')
+                    elif 'unit' in variable:
+                        entries[variable['objName']] = (variable['value'], variable['unit'])
+            if 'identifier' in entries:
+                return Device(entries.pop("identifier"),
+                              tty_path,
+                              'sml',
+                              entries)
+        return None
 
-        sp = os.path.sep
-        used_interfaces = [device.tty for device in devices]
-        potential_ttys = [f'{sp}dev{sp}{file_name}'
-                          for file_name in os.listdir(f'{sp}dev{sp}')
-                          if re.match(tty, file_name)
-                          and f'{sp}dev{sp}{file_name}' not in used_interfaces]
-        for tty_path in potential_ttys:
-            frame = SmlReader.__read_frame(tty_path)
-            if frame is not None and len(frame) > 1:
-                entries = {}
-                walk_frame(frame, entries)
-                if 'identifier' in entries:
-                    device = Device(entries.pop("identifier"),
-                                    tty_path,
-                                    'sml',
-                                    entries)
-                    devices.append(device)
+    @staticmethod
+    def __iter_val_lists(sml_frame: tp.Union[list, dict]) -> tp.Iterator[list]:
+        """
+        Walk the parsed frame without recursion and yield the value lists of all message bodies
+        :param sml_frame: sml data from parser
+        :return: value lists in frame order
+        """
+        stack = [sml_frame]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, list):
+                # Push in reverse to pop the elements in their original order
+                stack.extend(reversed(node))
+            elif isinstance(node, dict) and 'messageBody' in node:
+                yield node['messageBody'].get('valList', [])
 
-    def __parse(self, sml_frame: tp.Union[list, dict], parsed=None) -> Sample:
+    def __parse(self, sml_frame: tp.Union[list, dict]) -> Sample:
         """
         Internal helper to extract relevant information
         :param sml_frame: sml data from parser
-        :param parsed: only for recursive object reference forwarding
         """
-        if parsed is None:
-            parsed = Sample()
-        if isinstance(sml_frame, list):
-            for elem in sml_frame:
-                self.__parse(elem, parsed)
-        elif isinstance(sml_frame, dict):
-            if 'messageBody' in sml_frame:
-                var_list = sml_frame['messageBody'].get('valList', [])
+        parsed = Sample()
+        for var_list in self.__iter_val_lists(sml_frame):
+            if parsed.meter_id is None:
                 for variable in var_list:
-                    if 'unit' not in variable and strip(self.meter_id) in strip(str(variable.get('value', ''))):
-                        parsed.meter_id = variable.get('value')
+                    if 'unit' not in variable and 'value' in variable \
+                            and self._meter_id_norm in strip(str(variable['value'])):
+                        parsed.meter_id = variable['value']
                         break
-                if parsed.meter_id:
-                    parsed.channels.extend(var_list)
+            if parsed.meter_id:
+                parsed.channels.extend(var_list)
         return parsed
@@ -0,0 +1,53 @@
+"""
+Shared fixtures for the serial reader tests
+"""
+from abc import abstractmethod
+from pymeterreader.device_lib.base import BaseReader, _list_dev
+
+
+class MockSerialBase:
+    """
+    Port-level part of a serial.Serial stand-in, subclasses provide the data
+    """
+    def __init__(self):
+        self.close_called = 0
+        self.reset_error = None
+        self.low_latency = False
+
+    def reset_input_buffer(self):
+        if self.reset_error is not None:
+            raise self.reset_error
+
+    def set_low_latency_mode(self, low_latency):
+        self.low_latency = low_latency
+
+    def close(self):
+        self.close_called += 1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class ReaderTestMixin:
+    """
+    Mixin for unittest.TestCase, creates readers that give their interface back after each test
+    """
+    def setUp(self):
+        super().setUp()
+        _list_dev.cache_clear()
+
+    @abstractmethod
+    def _create_reader(self, *args, **kwargs) -> BaseReader:
+        """
+        Construct the reader under test
+        """
+        raise NotImplementedError("Test cases name the reader class they cover.")
+
+    def _reader(self, *args, **kwargs) -> BaseReader:
+        reader = self._create_reader(*args, **kwargs)
+        # BOUND_INTERFACES is shared by all readers, so a failing test must not leave it claimed
+        self.addCleanup(setattr, reader, 'tty_path', None)
+        return reader
@@ -0,0 +1,26 @@
+import unittest
+from unittest import mock
+from pymeterreader.device_lib.common import Sample, strip
+
+
+class TestCommon(unittest.TestCase):
+    @mock.patch('pymeterreader.device_lib.common.time', autospec=True)
+    def test_sample_defaults(self, mock_time):
+        mock_time.side_effect = [1.0, 2.0]
+        first = Sample()
+        second = Sample()
+        self.assertEqual(1.0, first.time)
+        self.assertEqual(2.0, second.time)
+        self.assertIsNone(first.meter_id)
+        first.channels.append({'objName': '1.8.0', 'value': 1, 'unit': 'kWh'})
+        self.assertEqual([], second.channels)
+
+    def test_strip(self):
+        self.assertEqual('1EMH0012345678', strip(' 1 emh00 12345678\r\n'))
+        self.assertEqual('1.8.0*255', strip('1.8.0*255'))
+        self.assertEqual('C', strip('°C\t'))
+        self.assertEqual('', strip(''))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,77 +1,137 @@
+import termios
 import unittest
 from unittest import mock
 from pymeterreader.device_lib.common import Device
+from pymeterreader.device_lib.reader_fixtures import MockSerialBase, ReaderTestMixin
 from pymeterreader.device_lib.meter_plain import PlainReader
 
-START_SEQ = b'\x1b\x1b\x1b\x1b\x01\x01\x01\x01'
+ID_MSG = b'/ISk5MT174-0001\r\n'
 TEST_FRAME = b'\x026.8(0006047*kWh)6.26(00428.35*m3)9.21(99999999)\r\n'
 # 9.21: meter id
 # 6.8: count
 
 
-class MockSerial:
-    def __init__(self, chars, lines):
-        self.chars = chars
+class MockSerial(MockSerialBase):
+    def __init__(self, lines):
+        super().__init__()
         self.lines = lines
-        self.close_called = 0
+        self.baudrate = None
         self.written = b''
 
-    def read(self):
-        if self.chars:
-            return self.chars.pop(0)
-        else:
-            return b'\x1b'
+    @property
+    def in_waiting(self):
+        return len(self.lines[0]) if self.lines else 0
+
+    def read(self, size=1):
+        if not self.lines:
+            return b''
+        data = self.lines[0][:size]
+        self.lines[0] = self.lines[0][size:]
+        if not self.lines[0]:
+            self.lines.pop(0)
+        return data
 
     def write(self, data):
         self.written += data
 
-    def readline(self):
-        return self.lines.pop(0)
-
     def flush(self):
         pass
 
-    def close(self):
-        self.close_called +=1
-
 
-def bytes_to_bytearray(data):
-    return [data[i:i+1] for i in range(len(data))]
+class TestPlainMeters(ReaderTestMixin, unittest.TestCase):
+    def _create_reader(self, *args, **kwargs) -> PlainReader:
+        return PlainReader(*args, **kwargs)
 
-
-class TestSmlMeters(unittest.TestCase):
-    @mock.patch('pymeterreader.device_lib.meter_sml.os.listdir', autospec=True)
+    @mock.patch('pymeterreader.device_lib.base.os.listdir', autospec=True)
     @mock.patch('pymeterreader.device_lib.meter_plain.serial', autospec=True)
     def test_init(self, mock_serial, mock_listdir):
-        mserial = MockSerial(b'', [b'\x00', TEST_FRAME])
+        mserial = MockSerial([ID_MSG, TEST_FRAME])
         mock_serial.Serial.return_value = mserial
         mock_listdir.return_value = ['ttyUSB0']
-        sml_meter = PlainReader('99999999')
-        sample = sml_meter.poll()
+        plain_meter = self._reader('99999999')
+        sample = plain_meter.poll()
         self.assertEqual(6047, sample.channels[0]['value'])
         self.assertEqual('6.8', sample.channels[0]['objName'])
         self.assertEqual('kWh', sample.channels[0]['unit'])
-        self.assertIsNotNone(sml_meter.tty_path)
+        self.assertIsNotNone(plain_meter.tty_path)
+        self.assertEqual(0, mserial.close_called)
+        plain_meter.close()
         self.assertEqual(1, mserial.close_called)
         self.assertEqual(40 * b'\00' + b"/?!\x0D\x0A", mserial.written)
+        self.assertTrue(mserial.low_latency)
+
+    @mock.patch('pymeterreader.device_lib.base.os.listdir', autospec=True)
+    @mock.patch('pymeterreader.device_lib.meter_plain.serial', autospec=True)
+    def test_multiline(self, mock_serial, mock_listdir):
+        mserial = MockSerial([b'/LUGCUH50\r\n', b'\x026.8(0006047*kWh)\r\n\xff6.26(004', b'28.35*m3)\r\n',
+                              b'9.21(99999999)\r\n!\r\n', b'\x03\x42'])
+        mock_serial.Serial.return_value = mserial
+        mock_listdir.return_value = ['ttyUSB0']
+        plain_meter = self._reader('99999999')
+        sample = plain_meter.poll()
+        self.assertEqual('99999999', sample.meter_id)
+        self.assertEqual(['6.8', '6.26'], [channel['objName'] for channel in sample.channels])
+        self.assertEqual(428.35, sample.channels[1]['value'])
+        self.assertEqual([b'\x03\x42'], mserial.lines)
+
+    @mock.patch('pymeterreader.device_lib.base.os.listdir', autospec=True)
+    @mock.patch('pymeterreader.device_lib.meter_plain.serial', autospec=True)
+    def test_single_chunk(self, mock_serial, mock_listdir):
+        mserial = MockSerial([ID_MSG + TEST_FRAME + b'!\r\n'])
+        mock_serial.Serial.return_value = mserial
+        mock_listdir.return_value = ['ttyUSB0']
+        sample = self._reader('99999999', low_latency=False).poll()
+        self.assertFalse(mserial.low_latency)
+        self.assertEqual('99999999', sample.meter_id)
+        self.assertEqual(['6.8', '6.26'], [channel['objName'] for channel in sample.channels])
 
-    @mock.patch('pymeterreader.device_lib.meter_sml.os.listdir', autospec=True)
+    @mock.patch('pymeterreader.device_lib.base.os.listdir', autospec=True)
+    @mock.patch('pymeterreader.device_lib.meter_plain.serial', autospec=True)
+    def test_reuse_port(self, mock_serial, mock_listdir):
+        mserial = MockSerial([ID_MSG, TEST_FRAME + b'!\r\n', ID_MSG, TEST_FRAME + b'!\r\n'])
+        mock_serial.Serial.return_value = mserial
+        mock_listdir.return_value = ['ttyUSB0']
+        plain_meter = self._reader('99999999')
+        self.assertIsNotNone(plain_meter.poll())
+        self.assertIsNotNone(plain_meter.poll())
+        self.assertEqual(1, mock_serial.Serial.call_count)
+        self.assertEqual(2400, mserial.baudrate)
+        self.assertEqual(0, mserial.close_called)
+        self.assertEqual(2 * (40 * b'\00' + b"/?!\x0D\x0A"), mserial.written)
+
+    @mock.patch('pymeterreader.device_lib.base.os.listdir', autospec=True)
+    @mock.patch('pymeterreader.device_lib.meter_plain.serial', autospec=True)
+    def test_hung_up_port(self, mock_serial, mock_listdir):
+        mserial = MockSerial([ID_MSG, TEST_FRAME + b'!\r\n'])
+        reopened = MockSerial([ID_MSG, TEST_FRAME + b'!\r\n'])
+        mock_serial.Serial.side_effect = [mserial, reopened]
+        mock_listdir.return_value = ['ttyUSB0']
+        plain_meter = self._reader('99999999')
+        self.assertIsNotNone(plain_meter.poll())
+        mserial.reset_error = termios.error(5, 'Input/output error')
+        self.assertIsNone(plain_meter.poll())
+        self.assertEqual(1, mserial.close_called)
+        self.assertEqual('/dev/ttyUSB0', plain_meter.tty_path)
+        self.assertEqual('99999999', plain_meter.poll().meter_id)
+        self.assertEqual(2, mock_serial.Serial.call_count)
+
+    @mock.patch('pymeterreader.device_lib.base.os.listdir', autospec=True)
     @mock.patch('pymeterreader.device_lib.meter_plain.serial', autospec=True)
     def test_init_fail(self, mock_serial, mock_listdir):
-        mserial = MockSerial(b'', [b'\x00', b'foobar'])
+        mserial = MockSerial([ID_MSG, b'foobar'])
         mock_serial.Serial.return_value = mserial
         mock_listdir.return_value = ['ttyUSB0']
-        sml_meter = PlainReader('99999999')
-        sample = sml_meter.poll()
+        plain_meter = self._reader('99999999')
+        sample = plain_meter.poll()
         self.assertIsNone(sample)
-        self.assertIsNone(sml_meter.tty_path)
+        self.assertIsNone(plain_meter.tty_path)
         self.assertEqual(1, mserial.close_called)
         self.assertEqual(40 * b'\00' + b"/?!\x0D\x0A", mserial.written)
 
-    @mock.patch('pymeterreader.device_lib.meter_sml.os.listdir', autospec=True)
+    @mock.patch('pymeterreader.device_lib.base.os.listdir', autospec=True)
     @mock.patch('pymeterreader.device_lib.meter_plain.serial', autospec=True)
     def test_detect(self, mock_serial, mock_listdir):
-        mserial = MockSerial(b'', [b'\x00', TEST_FRAME])
+        mserial = MockSerial([ID_MSG, TEST_FRAME])
         mock_serial.Serial.return_value = mserial
         mock_listdir.return_value = ['ttyUSB0']
         devices = [Device("dummy")]
@@ -81,6 +141,35 @@ class TestSmlMeters(unittest.TestCase):
         self.assertIn('6.8', devices[1].channels)
         self.assertIn('6.26', devices[1].channels)
         self.assertEqual('/dev/ttyUSB0', devices[1].tty)
+        # Scans must not change driver settings of ports no reader is bound to
+        self.assertFalse(mserial.low_latency)
+
+
+    @mock.patch('pymeterreader.device_lib.base.os.listdir', autospec=True)
+    @mock.patch('pymeterreader.device_lib.meter_plain.serial', autospec=True)
+    def test_detect_multiple(self, mock_serial, mock_listdir):
+        failing = MockSerial([])
+        failing.reset_error = termios.error(5, 'Input/output error')
+        ports = {'/dev/ttyUSB3': MockSerial([ID_MSG, TEST_FRAME.replace(b'99999999', b'33333333') + b'!\r\n']),
+                 '/dev/ttyUSB0': MockSerial([ID_MSG, TEST_FRAME + b'!\r\n']),
+                 '/dev/ttyUSB1': failing,
+                 '/dev/ttyUSB2': MockSerial([])}
+
+        def open_port(tty, **kwargs):
+            del kwargs
+            if tty == '/dev/ttyUSB4':
+                raise OSError(16, 'Device or resource busy')
+            return ports[tty]
+
+        mock_serial.Serial.side_effect = open_port
+        mock_listdir.return_value = ['ttyUSB3', 'ttyS0', 'ttyUSB0', 'ttyUSB1', 'ttyUSB4', 'ttyUSB2']
+        devices = [Device("dummy")]
+        PlainReader.detect(devices)
+        self.assertEqual(['dummy', '33333333', '99999999'], [device.identifier for device in devices])
+        self.assertEqual(['/dev/ttyUSB3', '/dev/ttyUSB0'], [device.tty for device in devices[1:]])
+        self.assertEqual(('0006047', 'kWh'), devices[2].channels['6.8'])
+        self.assertEqual(5, mock_serial.Serial.call_count)
+        self.assertTrue(all(port.close_called == 1 for port in ports.values()))
 
 
 if __name__ == '__main__':
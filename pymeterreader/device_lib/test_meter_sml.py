@@ -0,0 +1,123 @@
+import termios
+import unittest
+from unittest import mock
+import serial
+from pymeterreader.device_lib.common import Device
+from pymeterreader.device_lib.reader_fixtures import MockSerialBase, ReaderTestMixin
+from pymeterreader.device_lib.meter_sml import SmlReader
+
+START_SEQ = b'\x1b\x1b\x1b\x1b\x01\x01\x01\x01'
+END_SEQ = b'\x1b\x1b\x1b\x1b\x1a\x00\xab\xcd'
+TEST_FRAME = START_SEQ + b'\x76\x05\x01\x02\x03\x04\x62\x00\x62\x00' + END_SEQ
+TEST_VAL_LIST = [{'objName': '1-0:96.1.0*255', 'value': '1 EMH00 12345678'},
+                 {'objName': '1-0:1.8.0*255', 'value': 10000, 'unit': 'kWh'},
+                 {'objName': '1-0:16.7.0*255', 'value': 350, 'unit': 'W'}]
+PARSED_FRAME = [len(TEST_FRAME), [{'messageBody': {'codepage': None}},
+                                  [{'messageBody': {'valList': TEST_VAL_LIST}}]]]
+
+
+class MockSerial(MockSerialBase):
+    def __init__(self, data, chunk_size=None):
+        super().__init__()
+        self.data = data
+        self.chunk_size = chunk_size
+
+    @property
+    def in_waiting(self):
+        return min(len(self.data), self.chunk_size or len(self.data))
+
+    def read(self, size=1):
+        chunk, self.data = self.data[:size], self.data[size:]
+        return chunk
+
+
+class TestSmlMeters(ReaderTestMixin, unittest.TestCase):
+    def _create_reader(self, *args, **kwargs) -> SmlReader:
+        return SmlReader(*args, **kwargs)
+
+    @mock.patch('pymeterreader.device_lib.meter_sml.SmlBase', autospec=True)
+    @mock.patch('pymeterreader.device_lib.base.os.listdir', autospec=True)
+    @mock.patch('pymeterreader.device_lib.meter_sml.serial', autospec=True)
+    def test_init(self, mock_serial, mock_listdir, mock_sml):
+        mserial = MockSerial(b'\x00\x1b\x1b\x01' + TEST_FRAME + START_SEQ[:5])
+        mock_serial.Serial.return_value = mserial
+        mock_listdir.return_value = ['ttyUSB0']
+        mock_sml.parse_frame.return_value = PARSED_FRAME
+        sml_meter = self._reader('1 EMH00 12345678')
+        sample = sml_meter.poll()
+        mock_sml.parse_frame.assert_called_once_with(TEST_FRAME)
+        self.assertEqual('1 EMH00 12345678', sample.meter_id)
+        self.assertEqual(TEST_VAL_LIST, sample.channels)
+        self.assertIsNotNone(sml_meter.tty_path)
+        self.assertEqual(0, mserial.close_called)
+        self.assertTrue(mserial.low_latency)
+        sml_meter.tty_path = None
+        self.assertEqual(1, mserial.close_called)
+
+    @mock.patch('pymeterreader.device_lib.meter_sml.SmlBase', autospec=True)
+    @mock.patch('pymeterreader.device_lib.base.os.listdir', autospec=True)
+    @mock.patch('pymeterreader.device_lib.meter_sml.serial', autospec=True)
+    def test_split_frame(self, mock_serial, mock_listdir, mock_sml):
+        mock_serial.Serial.return_value = MockSerial(b'\x1b\x1b' + TEST_FRAME + TEST_FRAME, chunk_size=3)
+        mock_listdir.return_value = ['ttyUSB0']
+        mock_sml.parse_frame.return_value = PARSED_FRAME
+        sample = self._reader('1 EMH00 12345678').poll()
+        mock_sml.parse_frame.assert_called_once_with(TEST_FRAME)
+        self.assertEqual('1 EMH00 12345678', sample.meter_id)
+
+    @mock.patch('pymeterreader.device_lib.meter_sml.SmlBase', autospec=True)
+    @mock.patch('pymeterreader.device_lib.base.os.listdir', autospec=True)
+    @mock.patch('pymeterreader.device_lib.meter_sml.serial', autospec=True)
+    def test_hung_up_port(self, mock_serial, mock_listdir, mock_sml):
+        mserial = MockSerial(TEST_FRAME)
+        reopened = MockSerial(TEST_FRAME)
+        mock_serial.Serial.side_effect = [mserial, reopened]
+        mock_listdir.return_value = ['ttyUSB0']
+        mock_sml.parse_frame.return_value = PARSED_FRAME
+        sml_meter = self._reader('1 EMH00 12345678')
+        self.assertIsNotNone(sml_meter.poll())
+        mserial.reset_error = termios.error(5, 'Input/output error')
+        self.assertIsNone(sml_meter.poll())
+        self.assertEqual(1, mserial.close_called)
+        self.assertEqual('/dev/ttyUSB0', sml_meter.tty_path)
+        self.assertEqual('1 EMH00 12345678', sml_meter.poll().meter_id)
+        self.assertEqual(2, mock_serial.Serial.call_count)
+
+    @mock.patch('pymeterreader.device_lib.meter_sml.SmlBase', autospec=True)
+    @mock.patch('pymeterreader.device_lib.base.os.listdir', autospec=True)
+    @mock.patch('pymeterreader.device_lib.meter_sml.serial', autospec=True)
+    def test_init_fail(self, mock_serial, mock_listdir, mock_sml):
+        mserial = MockSerial(TEST_FRAME)
+        mock_serial.Serial.return_value = mserial
+        mock_listdir.return_value = ['ttyUSB0']
+        mock_sml.parse_frame.return_value = PARSED_FRAME
+        sml_meter = self._reader('1 EMH00 87654321')
+        sample = sml_meter.poll()
+        self.assertIsNone(sample)
+        self.assertIsNone(sml_meter.tty_path)
+
+    def test_parity(self):
+        self.assertEqual(serial.PARITY_NONE, SmlReader('1 EMH00 12345678').parity)
+        self.assertEqual(serial.PARITY_EVEN, SmlReader('1 EMH00 12345678', parity='even').parity)
+        self.assertEqual(serial.PARITY_ODD, SmlReader('1 EMH00 12345678', parity=' O ').parity)
+        self.assertEqual(serial.PARITY_NONE, SmlReader('1 EMH00 12345678', parity='MARK').parity)
+
+    @mock.patch('pymeterreader.device_lib.meter_sml.SmlBase', autospec=True)
+    @mock.patch('pymeterreader.device_lib.base.os.listdir', autospec=True)
+    @mock.patch('pymeterreader.device_lib.meter_sml.serial', autospec=True)
+    def test_detect(self, mock_serial, mock_listdir, mock_sml):
+        mserial = MockSerial(TEST_FRAME)
+        mock_serial.Serial.return_value = mserial
+        mock_listdir.return_value = ['ttyUSB0']
+        mock_sml.parse_frame.return_value = PARSED_FRAME
+        devices = [Device("dummy")]
+        SmlReader.detect(devices)
+        self.assertEqual(devices[1].identifier, '1 EMH00 12345678')
+        self.assertEqual((10000, 'kWh'), devices[1].channels['1-0:1.8.0*255'])
+        self.assertIn('1-0:16.7.0*255', devices[1].channels)
+        self.assertEqual('/dev/ttyUSB0', devices[1].tty)
+        self.assertFalse(mserial.low_latency)
+
+
+if __name__ == '__main__':
+    unittest.main()
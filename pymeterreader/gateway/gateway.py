@@ -7,7 +7,9 @@ import requests
 import json
 from contextlib import suppress
 from abc import ABC, abstractmethod
-from logging import error, debug, info
+from logging import getLogger
+
+logger = getLogger(__name__)
 
 
 class BaseGateway(ABC):
@@ -21,7 +23,14 @@ class BaseGateway(ABC):
         self.interpolate = interpolate
 
     @abstractmethod
-    def post(self, uuid: str, value: tp.Union[int, float], timestamp: int) -> bool:
+    def post(self, uuid: str, value: tp.Union[int, float], timestamp: tp.Union[int, float]) -> bool:
+        """
+        Upload a value to the middleware
+        :param uuid: uuid of db entry to feed
+        :param value: value to upload
+        :param timestamp: time of the reading in seconds since the epoch, e.g. from time()
+        :return: True if successful
+        """
         raise NotImplementedError("Abstract Base for POST")
 
     @abstractmethod
@@ -46,17 +55,16 @@ class VolkszaehlerGateway(BaseGateway):
 
     def post(self, uuid: str, value: tp.Union[int, float], timestamp: tp.Union[int, float]) -> bool:
         rest_url = self.urljoin(self.url, self.DATA_PATH, uuid, self.SUFFIX)
-        if isinstance(timestamp, float):
-            timestamp = int(timestamp * 1000)
         try:
-            data = {"ts": timestamp, "value": value}
+            # Timestamps are seconds since the epoch (see time() and get()), the middleware expects ms
+            data = {"ts": int(timestamp * 1000), "value": value}
             response = requests.post(rest_url, data=data)
             if response.status_code != 200:
-                error(f'POST {data} to {rest_url}: {response}')
+                logger.error('POST %s to %s: %s', data, rest_url, response)
             else:
-                info(f'POST {data} to {rest_url}: {response}')
+                logger.info('POST %s to %s: %s', data, rest_url, response)
         except OSError as err:
-            error(err)
+            logger.error(err)
             return False
         return True
 
@@ -67,11 +75,11 @@ class VolkszaehlerGateway(BaseGateway):
                       "to": int(time() * 1000)}
             response = requests.get(rest_url, params=params)
             if response.status_code != 200:
-                error(f'GET {params} from {rest_url}: {response}')
+                logger.error('GET %s from %s: %s', params, rest_url, response)
             else:
-                debug(f'GET {params} from {rest_url}: {response}')
+                logger.debug('GET %s from %s: %s', params, rest_url, response)
         except OSError as err:
-            error(f'Error during GET: {err}')
+            logger.error('Error during GET: %s', err)
             return None
         parsed = json.loads(response.content.decode('utf-8'))
         if 'data' in parsed and parsed.get('data').get('rows') > 0:
@@ -82,9 +90,9 @@ class VolkszaehlerGateway(BaseGateway):
                 time_stamp = int(latest_entry[0]) // 1000
                 value = latest_entry[1]
                 if not isinstance(value, (int, float)):
-                    error(f"{value} is not of type int or float!")
+                    logger.error("%s is not of type int or float!", value)
                     return None
-                info(f"GET {uuid} returned timestamp={time_stamp * 1000} value={value}")
+                logger.info("GET %s returned timestamp=%d value=%s", uuid, time_stamp * 1000, value)
                 return time_stamp, value
         return None
 
@@ -96,12 +104,12 @@ class VolkszaehlerGateway(BaseGateway):
         try:
             response = requests.get(rest_url)
             if response.status_code != 200:
-                error(f'GET from {rest_url}: {response}')
+                logger.error('GET from %s: %s', rest_url, response)
             else:
-                debug(f'GET from {rest_url}: {response}')
+                logger.debug('GET from %s: %s', rest_url, response)
                 return json.loads(response.content)['channels']
         except OSError as err:
-            error(f'Error during GET: {err}')
+            logger.error('Error during GET: %s', err)
         return {}
 
     @staticmethod
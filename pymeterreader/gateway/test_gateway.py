@@ -0,0 +1,21 @@
+import unittest
+from unittest import mock
+from pymeterreader.gateway import VolkszaehlerGateway
+
+
+class TestVolkszaehlerGateway(unittest.TestCase):
+    @mock.patch('pymeterreader.gateway.gateway.requests', autospec=True)
+    def test_post_timestamp_in_ms(self, mock_requests):
+        mock_requests.post.return_value.status_code = 200
+        gateway = VolkszaehlerGateway('http://localhost/middleware.php')
+        self.assertTrue(gateway.post('c07ef180', 10000, 1600000000))
+        self.assertTrue(gateway.post('c07ef180', 10001, 1600000000.5))
+        self.assertEqual([mock.call('http://localhost/middleware.php/data/c07ef180.json',
+                                    data={'ts': 1600000000000, 'value': 10000}),
+                          mock.call('http://localhost/middleware.php/data/c07ef180.json',
+                                    data={'ts': 1600000000500, 'value': 10001})],
+                         mock_requests.post.call_args_list)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,7 +5,7 @@ Primary module
 # pylint: disable=wildcard-import
 import logging
 import signal
-from time import time, sleep
+from time import time, monotonic
 from threading import Thread, Event
 from yaml import load, FullLoader
 import typing as tp
@@ -38,6 +38,8 @@ class MeterReaderNode:
     MeterReaderNode represents a mapping of a meter's channels to uuids.
     """
     class ChannelInfo:
+        __slots__ = ('uuid', 'interval', 'factor', 'last_upload', 'last_value')
+
         def __init__(self, uuid, interval, factor, last_upload, last_value):
             """
             Channel info structure
@@ -170,25 +172,6 @@ class MeterReaderNode:
 
 
 class MeterReaderTask(Thread):
-    class Timer(Thread):
-        """
-        Precise event timer
-        """
-        def __init__(self, interval: float or int, event: Event):
-            Thread.__init__(self)
-            self.__interval = interval
-            self.__event = event
-            self.daemon = True
-            self.__stop_event = Event()
-
-        def run(self):
-            while not self.__stop_event.is_set():
-                sleep(self.__interval)
-                self.__event.set()
-
-        def stop(self):
-            self.__stop_event.set()
-
     def __init__(self, meter_reader_node: MeterReaderNode):
         """
         Worker thread will call "poll and push" as often
@@ -197,34 +180,30 @@ class MeterReaderTask(Thread):
         """
         Thread.__init__(self)
         self.__meter_reader_mode = meter_reader_node
-        self.__timer = Event()
         self.stop_event = Event()
-        self.__timer_thread = self.Timer(self.__meter_reader_mode.poll_interval,
-                                         self.__timer)
         self.daemon = True
-        self.__timer_thread.start()
         super().start()
 
-    def __block(self):
-        self.__timer.wait()
-        self.__timer.clear()
-        return True
-
     def stop(self):
         """
         Call to stop the thread
         """
         self.stop_event.set()
-        self.__timer.set()
 
     def run(self):
         """
         Start the worker thread.
         """
-        self.__block()  # initial sample polled during initialization
-        while not self.stop_event.is_set():
+        interval = self.__meter_reader_mode.poll_interval
+        # Schedule against a monotonic deadline so the poll cost does not accumulate as drift
+        next_tick = monotonic() + interval  # initial sample polled during initialization
+        while not self.stop_event.wait(max(0.0, next_tick - monotonic())):
             self.__meter_reader_mode.poll_and_push()
-            self.__block()
+            next_tick += interval
+            overdue = monotonic() - next_tick
+            if overdue > 0 and interval > 0:
+                # Skip the ticks missed by a slow poll, but keep the phase
+                next_tick += overdue // interval * interval
 
 
 def map_configuration(config: dict) -> tp.List[MeterReaderNode]:  # noqa MC0001
@@ -1,6 +1,7 @@
 import unittest
+from time import monotonic, sleep
 from unittest import mock
-from pymeterreader.meter_reader import map_configuration
+from pymeterreader.meter_reader import map_configuration, MeterReaderTask
 from pymeterreader.gateway import BaseGateway
 from pymeterreader.device_lib.common import Sample
 
@@ -60,5 +61,46 @@ class TestMeterReader(unittest.TestCase):
         self.assertEqual(3, len(meter_reader_nodes))
 
 
+class TestMeterReaderTask(unittest.TestCase):
+    def test_stop_wakes_worker(self):
+        node = mock.Mock(poll_interval=60)
+        task = MeterReaderTask(node)
+        task.stop()
+        task.join(timeout=1)
+        self.assertFalse(task.is_alive())
+        node.poll_and_push.assert_not_called()
+
+    def test_slow_poll_skips_missed_ticks(self):
+        poll_times = []
+
+        def poll_and_push():
+            poll_times.append(monotonic())
+            if len(poll_times) == 1:
+                sleep(0.45)
+
+        node = mock.Mock(poll_interval=0.1)
+        node.poll_and_push.side_effect = poll_and_push
+        task = MeterReaderTask(node)
+        self.addCleanup(task.join, 1)
+        self.addCleanup(task.stop)
+        sleep(0.9)
+        task.stop()
+        task.join(timeout=1)
+        self.assertFalse(task.is_alive())
+        self.assertGreaterEqual(len(poll_times), 4)
+        gaps = [later - earlier for earlier, later in zip(poll_times[1:], poll_times[2:])]
+        # Only the tick overdue when the slow poll returns may follow right away
+        self.assertLessEqual(len([gap for gap in gaps if gap < 0.05]), 1)
+
+    def test_zero_interval(self):
+        node = mock.Mock(poll_interval=0)
+        task = MeterReaderTask(node)
+        self.addCleanup(task.join, 1)
+        self.addCleanup(task.stop)
+        sleep(0.05)
+        self.assertTrue(task.is_alive())
+        self.assertGreater(node.poll_and_push.call_count, 1)
+
+
 if __name__ == '__main__':
     unittest.main()